@@ -2,15 +2,65 @@
 """
 Project Requirements:
 1. Generate simulated sensor data with realistic patterns
-2. Include timestamp, value, and unique packet ID for each data point
+2. Include timestamp (epoch milliseconds), value, and unique packet ID for each data point
 3. Produce smooth transitions between values (no sudden jumps)
 4. Support configurable base value and variance
 5. Implement trending behavior to simulate real-world patterns
+6. Generate values in vectorized batches for high packet rates
 """
 
-import random
+import random  # only used by the scalar generate_value
 import time
-from datetime import datetime
+from collections import deque
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; without it walk_trend runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+BUFFER_SIZE = 1024  # values generated per refill of the packet buffer
+SMOOTH_CHUNK = 256  # keeps 0.7 ** -n well inside float range
+
+# The packet schema is fixed, so values are spliced into a bytes template
+# instead of walking each dict with json.dumps and re-encoding the result
+PACKET_TEMPLATE = b'{"ts_ms":%d,"value":%a,"packet_id":%d}'
+
+def encode_packet(data):
+    """Serialize a data packet dictionary as JSON bytes"""
+    return PACKET_TEMPLATE % (data["ts_ms"], data["value"], data["packet_id"])
+
+@njit(cache=True)
+def walk_trend(current_trend, steps):
+    """
+    Accumulate pre-drawn trend steps, clamping to [-1, 1] after every
+    step exactly like generate_value does. Compiled with numba when available.
+    Returns: Array of trend values, one per step
+    """
+    trends = np.empty_like(steps)
+    for i in range(len(steps)):
+        current_trend = max(min(current_trend + steps[i], 1.0), -1.0)
+        trends[i] = current_trend
+    return trends
+
+# Compile walk_trend now, on the importing thread, so the first refill on a
+# publish thread doesn't hold the GIL (and freeze the GUI) while numba compiles
+walk_trend(0.0, np.zeros(1))
+
+def smooth_values(values, last_value):
+    """
+    Apply the 70% previous / 30% new smoothing to a whole array at once,
+    using the closed form y[k] = 0.7^k * (y[0] + 0.3 * sum(x[j] / 0.7^j)).
+    Returns: Array of smoothed values
+    """
+    smoothed = np.empty_like(values)
+    for start in range(0, len(values), SMOOTH_CHUNK):
+        chunk = values[start:start + SMOOTH_CHUNK]
+        decay = 0.7 ** np.arange(1, len(chunk) + 1)
+        smoothed[start:start + len(chunk)] = decay * (last_value + 0.3 * np.cumsum(chunk / decay))
+        last_value = smoothed[start + len(chunk) - 1]
+    return smoothed
 
 class DataGenerator:
     def __init__(self, base_value=20, variance=5, trend_strength=0.1):
@@ -25,6 +75,11 @@ class DataGenerator:
         self.trend_strength = trend_strength
         self.current_trend = 0
         self.last_value = base_value
+        self.rng = np.random.default_rng()
+        # Packet IDs count up from the start time in microseconds, so they stay
+        # unique within a run, don't repeat across restarts and fit in a JSON double
+        self.next_packet_id = time.time_ns() // 1000
+        self.buffer = deque()  # pre-computed values waiting to be packaged
 
     def generate_value(self):
         """
@@ -32,6 +87,9 @@ class DataGenerator:
         - Random walk trend
         - Controlled variance
         - Smooth transitions between values
+        Not used by the publisher, which takes buffered values from
+        generate_values; kept for external callers and as the scalar
+        reference that generate_values must match.
         Returns: A rounded float value
         """
         # Update trend (random walk)
@@ -49,16 +107,78 @@ class DataGenerator:
 
         return round(new_value, 2)
 
+    def generate_values(self, n):
+        """
+        Generate n data values in one batch with the same trend,
+        variance and smoothing behaviour as generate_value.
+        Returns: Array of rounded float values
+        """
+        # Update trend (random walk kept between -1 and 1)
+        steps = self.rng.uniform(-self.trend_strength, self.trend_strength, n)
+        trends = walk_trend(float(self.current_trend), steps)
+        self.current_trend = float(trends[-1])
+
+        # Generate new values
+        random_components = self.rng.uniform(-self.variance, self.variance, n)
+        new_values = self.base_value + random_components + trends * self.variance
+
+        # Ensure smooth transitions between values
+        new_values = smooth_values(new_values, self.last_value)
+        self.last_value = float(new_values[-1])
+
+        return np.round(new_values, 2)
+
+    def next_value(self):
+        """Return the next buffered value, refilling the buffer in batches"""
+        if not self.buffer:
+            self.buffer.extend(self.generate_values(BUFFER_SIZE).tolist())
+        return self.buffer.popleft()
+
+    def get_data_packets(self, n, interval_ms=1):
+        """
+        Create n data packets at once, topping up the value buffer with a
+        single vectorized call when needed.
+        - interval_ms: Spacing between packet timestamps; the last packet
+          is stamped with the current time (default: 1)
+        Returns: List of data packet dictionaries
+        """
+        if len(self.buffer) < n:
+            self.buffer.extend(self.generate_values(max(BUFFER_SIZE, n - len(self.buffer))).tolist())
+        first_ts = time.time_ns() // 1_000_000 - (n - 1) * interval_ms
+        first_id = self.next_packet_id
+        self.next_packet_id += n
+        return [{"ts_ms": first_ts + i * interval_ms, "value": self.buffer.popleft(),
+                 "packet_id": first_id + i}
+                for i in range(n)]
+
     def get_data_packet(self):
         """
         Create a complete data packet containing:
-        - ISO format timestamp
+        - Timestamp in milliseconds since the Unix epoch
         - Generated sensor value
-        - Unique packet ID (millisecond timestamp)
+        - Unique packet ID (monotonic counter)
+        Not used by the publisher, which sends get_encoded_packet bytes;
+        kept for external callers that want a dictionary.
         Returns: Dictionary with data packet information
         """
+        packet_id = self.next_packet_id
+        self.next_packet_id += 1
         return {
-            "timestamp": datetime.now().isoformat(),
-            "value": self.generate_value(),
-            "packet_id": int(time.time() * 1000)  # millisecond timestamp as packet ID
+            "ts_ms": time.time_ns() // 1_000_000,
+            "value": self.next_value(),
+            "packet_id": packet_id
         }
+
+    def get_encoded_packet(self, scale=1, ts_ms=None):
+        """
+        Create a data packet already serialized as JSON bytes, without
+        building the intermediate dictionary.
+        - scale: Multiplier applied to the value (used to simulate corrupt data)
+        - ts_ms: Packet timestamp in epoch milliseconds (default: current time)
+        Returns: JSON bytes with the same fields as get_data_packet
+        """
+        if ts_ms is None:
+            ts_ms = time.time_ns() // 1_000_000
+        packet_id = self.next_packet_id
+        self.next_packet_id += 1
+        return PACKET_TEMPLATE % (ts_ms, self.next_value() * scale, packet_id)
@@ -5,6 +5,7 @@ IoT Data Publisher Implementation Requirements:
 1. Multiple Publisher Clients:
    - Can run multiple instances to simulate different IoT devices
    - Each instance can have different base values and intervals
+   - "--fleet N" runs N devices in one process over a shared MQTT connection
 
 2. Value Generation (group_5_data_generator.py):
    - Implemented in separate class (DataGenerator)
@@ -15,8 +16,9 @@ IoT Data Publisher Implementation Requirements:
 
 3. Data Packaging:
    - Each value packaged as JSON object
+   - Packets sent in JSON array batches to reduce publish overhead
    - Required fields:
-     * timestamp (ISO format)
+     * ts_ms (timestamp in epoch milliseconds)
      * packet_id (unique identifier)
      * value (sensor reading)
 
@@ -25,7 +27,12 @@ IoT Data Publisher Implementation Requirements:
    - Configurable broker host and topic
    - Implements 1% random transmission loss
    
-5. Extra Features:
+5. Headless Mode:
+   - "--batch N" publishes N packets over one connection without the GUI
+   - Packet timestamps are spaced by "--interval" ms, ending at the send time
+   - Intended for load testing; no loss or corruption is simulated
+
+6. Extra Features:
    - Simulates corrupt data (1% chance of wild values)
    - GUI interface for easy configuration
    - Real-time status updates
@@ -35,22 +42,99 @@ IoT Data Publisher Implementation Requirements:
 import tkinter as tk
 from tkinter import ttk
 import paho.mqtt.client as mqtt
-import json
+import paho.mqtt.publish as publish
+import argparse
 import random
-import time
+import numpy as np
 import threading
-from group_5_data_generator import DataGenerator
+import time
+from collections import deque
+from group_5_data_generator import DataGenerator, encode_packet
+
+# Packets due within this window are coalesced into a single MQTT publish
+BATCH_WINDOW_MS = 100
+MAX_BATCH_SIZE = 32
+
+OUTCOME_BUFFER_SIZE = 4096  # loss/corruption outcomes drawn per refill
+
+STATUS_REFRESH_MS = 200  # how often queued status messages are written out
+STATUS_LOG_LINES = 200  # most recent status messages kept on screen
+
+def batch_size_for(interval_ms):
+    """Number of packets to send per publish for the given interval"""
+    if interval_ms <= 0:
+        return MAX_BATCH_SIZE
+    return max(1, min(MAX_BATCH_SIZE, int(BATCH_WINDOW_MS // interval_ms)))
+
+def encode_batch(batch):
+    """Join already-encoded packets into JSON array bytes"""
+    return b"[" + b",".join(batch) + b"]"
+
+def publish_headless(count, host, topic, interval_ms=1):
+    """Publishes count packets through a single connection and returns"""
+    packets = DataGenerator().get_data_packets(count, interval_ms)
+    msgs = [{"topic": topic, "payload": encode_packet(data), "qos": 0}
+            for data in packets]
+    publish.multiple(msgs, hostname=host, port=1883)
+
+def run_fleet(count, host, topic):
+    """Runs count publisher windows on distinct topics sharing one MQTT connection"""
+    client = mqtt.Client()
+    client.connect(host, 1883, 60)
+    client.loop_start()  # one network thread coalesces writes for every device
+    
+    root = tk.Tk()
+    publishers = []
+    for i in range(count):
+        window = root if i == 0 else tk.Toplevel(root)
+        publishers.append(PublisherGUI(window, mqtt_client=client, host=host,
+                                       topic=f"{topic}/device{i + 1}"))
+        window.title(f"IoT Data Publisher - Device {i + 1}")
+        
+    # Closing a device window stops its publish thread before destroying it;
+    # closing the main window takes every device down with it
+    def close_all():
+        for publisher in reversed(publishers):
+            publisher.close()
+            
+    for publisher in publishers[1:]:
+        publisher.root.protocol("WM_DELETE_WINDOW", publisher.close)
+    root.protocol("WM_DELETE_WINDOW", close_all)
+    root.mainloop()
+    
+    client.disconnect()
+    client.loop_stop()
 
 class PublisherGUI:
-    def __init__(self, root):
+    def __init__(self, root, mqtt_client=None, host="localhost", topic="iot/sound_data"):
+        """
+        Creates a publisher window:
+        - mqtt_client: Connected client shared with other publishers; when
+          omitted, each Start opens this window's own connection
+        - host, topic: Initial broker host and topic shown in the controls
+        """
         self.root = root
         self.root.title("IoT Data Publisher")
         
         self.data_generator = DataGenerator()
         self.is_running = False
-        self.mqtt_client = None
+        self.stop_event = threading.Event()  # wakes the publish loop on stop
+        self.publish_thread = None
+        self.drain_job = None  # pending root.after id for drain_status
+        self.closed = False
+        self.mqtt_client = mqtt_client
+        self.shared_client = mqtt_client is not None  # owned by the caller, never disconnected here
+        self.default_host = host
+        self.default_topic = topic
+        self.publish_topic = None  # settings snapshotted when publishing starts
+        self.publish_interval = None
+        self.status_queue = deque(maxlen=1000)  # messages waiting for the next drain
+        self.status_log = deque(maxlen=STATUS_LOG_LINES)  # messages currently displayed
+        self.rng = np.random.default_rng()
+        self.refill_outcomes()
         
         self.setup_gui()
+        self.drain_status()
         
     def setup_gui(self):
         # Control Frame
@@ -60,13 +144,15 @@ class PublisherGUI:
         # MQTT Broker settings
         ttk.Label(control_frame, text="Broker Host:").grid(row=0, column=0, padx=5, pady=5)
         self.broker_host = ttk.Entry(control_frame)
-        self.broker_host.insert(0, "localhost")
+        self.broker_host.insert(0, self.default_host)
         self.broker_host.grid(row=0, column=1, padx=5, pady=5)
+        if self.shared_client:
+            self.broker_host.config(state="disabled")
         
         # MQTT Topic configuration
         ttk.Label(control_frame, text="Topic:").grid(row=1, column=0, padx=5, pady=5)
         self.topic = ttk.Entry(control_frame)
-        self.topic.insert(0, "iot/sound_data")
+        self.topic.insert(0, self.default_topic)
         self.topic.grid(row=1, column=1, padx=5, pady=5)
         
         # Generator settings
@@ -95,53 +181,142 @@ class PublisherGUI:
     def start_publishing(self):
         """Initializes MQTT client and starts publishing thread"""
         if not self.is_running:
+            # Read the entries once here so the publish thread never calls into Tk
+            try:
+                self.publish_interval = float(self.interval.get())
+            except ValueError:
+                self.update_status("Error: Interval must be a number\n")
+                return
+            self.publish_topic = self.topic.get()
+            
             self.is_running = True
-            self.mqtt_client = mqtt.Client()
-            self.mqtt_client.connect(self.broker_host.get(), 1883, 60)
+            self.stop_event.clear()
+            if not self.shared_client:
+                self.mqtt_client = mqtt.Client()
+                self.mqtt_client.connect(self.broker_host.get(), 1883, 60)
+                self.mqtt_client.loop_start()  # network I/O runs on paho's own thread
             
             # Start publishing thread
             self.publish_thread = threading.Thread(target=self.publish_loop)
             self.publish_thread.daemon = True
             self.publish_thread.start()
             
-            self.status_text.insert(tk.END, "Started publishing...\n")
+            self.update_status("Started publishing...\n")
             
     def stop_publishing(self):
-        """Stops publishing and disconnects from broker"""
+        """Stops publishing and disconnects from broker (unless the client is shared)"""
         self.is_running = False
-        if self.mqtt_client:
+        self.stop_event.set()
+        if self.mqtt_client and not self.shared_client:
             self.mqtt_client.disconnect()
-        self.status_text.insert(tk.END, "Stopped publishing...\n")
+            self.mqtt_client.loop_stop()
+        self.update_status("Stopped publishing...\n")
+        
+    def close(self):
+        """Stops publishing, cancels pending GUI updates and destroys the window"""
+        if self.closed:
+            return
+        self.closed = True
+        self.stop_publishing()
+        if self.publish_thread:
+            self.publish_thread.join(timeout=1)  # no publishes after the window is gone
+        if self.drain_job:
+            self.root.after_cancel(self.drain_job)
+        self.root.destroy()
         
     def publish_loop(self):
-        """Main publishing loop with error simulation features"""
+        """
+        Main publishing loop with error simulation features.
+        Packets are sent as a JSON array so short intervals cost one
+        publish per batch instead of one per packet.
+        """
+        topic = self.publish_topic
+        batch_size = batch_size_for(self.publish_interval)
+        batch_wait = self.publish_interval * batch_size / 1000
+        
         while self.is_running:
             try:
-                # Simulate missing data (1% chance)
-                if random.random() > 0.01:
-                    data = self.data_generator.get_data_packet()
+                batch = []
+                
+                # Stamp each slot one interval apart, ending at the current time,
+                # so timestamps follow the configured rate rather than the batching
+                batch_end = time.time_ns() // 1_000_000
+                
+                for slot in range(batch_size):
+                    i = self.outcome_index
+                    if i == OUTCOME_BUFFER_SIZE:
+                        self.refill_outcomes()
+                        i = 0
+                    self.outcome_index = i + 1
                     
-                    # Simulate corrupt data (1% chance)
-                    if random.random() < 0.01:
-                        data["value"] *= random.uniform(10, 100)
+                    # Simulate missing data (1% chance)
+                    if self.keep_mask[i]:
+                        # Simulate corrupt data (1% chance)
+                        scale = random.uniform(10, 100) if self.corrupt_mask[i] else 1
+                        
+                        ts_ms = batch_end - round((batch_size - 1 - slot) * self.publish_interval)
+                        batch.append(self.data_generator.get_encoded_packet(scale, ts_ms))
                         
-                    # Package and publish data
-                    message = json.dumps(data)
-                    self.mqtt_client.publish(self.topic.get(), message)
+                # Package and publish data
+                if batch:
+                    message = encode_batch(batch)
+                    self.mqtt_client.publish(topic, message)
                     
-                    self.root.after(0, self.update_status, f"Published: {message}\n")
+                    self.update_status(f"Published: {message.decode()}\n")
                     
-                time.sleep(float(self.interval.get()) / 1000)
+                # Wait for the whole batch so the packet rate matches the interval;
+                # stop_publishing interrupts the wait immediately
+                self.stop_event.wait(batch_wait)
                 
             except Exception as e:
-                self.root.after(0, self.update_status, f"Error: {str(e)}\n")
+                self.update_status(f"Error: {str(e)}\n")
                 
+    def refill_outcomes(self):
+        """Pre-draws the loss and corruption outcomes for the next packets"""
+        self.keep_mask = (self.rng.random(OUTCOME_BUFFER_SIZE) > 0.01).tolist()
+        self.corrupt_mask = (self.rng.random(OUTCOME_BUFFER_SIZE) < 0.01).tolist()
+        self.outcome_index = 0
+        
     def update_status(self, message):
-        """Updates GUI status display"""
-        self.status_text.insert(tk.END, message)
-        self.status_text.see(tk.END)
+        """Queues a status message; safe to call from any thread"""
+        self.status_queue.append(message)
+        
+    def drain_status(self):
+        """Moves queued status messages into the log and redraws it in one pass"""
+        if self.status_queue:
+            self.status_log.extend(self.status_queue.popleft() for _ in range(len(self.status_queue)))
+            
+            # Replace the whole text so the widget never holds more than the log
+            self.status_text.delete("1.0", tk.END)
+            self.status_text.insert(tk.END, "".join(self.status_log))
+            self.status_text.see(tk.END)
+        self.drain_job = self.root.after(STATUS_REFRESH_MS, self.drain_status)
         
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = PublisherGUI(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="IoT Data Publisher")
+    parser.add_argument("--batch", type=int, metavar="N",
+                        help="publish N packets without the GUI, then exit")
+    parser.add_argument("--fleet", type=int, metavar="N",
+                        help="open N publisher windows sharing one MQTT connection")
+    parser.add_argument("--interval", type=int, default=1, metavar="MS",
+                        help="timestamp spacing between --batch packets (default: 1)")
+    parser.add_argument("--host", default="localhost", help="broker host for --batch/--fleet")
+    parser.add_argument("--topic", default="iot/sound_data",
+                        help="topic for --batch; topic prefix for --fleet")
+    args = parser.parse_args()
+    if args.batch is not None and args.batch < 1:
+        parser.error("--batch N must be at least 1")
+    if args.fleet is not None and args.fleet < 1:
+        parser.error("--fleet N must be at least 1")
+    if args.interval < 0:
+        parser.error("--interval must not be negative")
+        
+    if args.batch is not None:
+        publish_headless(args.batch, args.host, args.topic, args.interval)
+        print(f"Published {args.batch} packets to {args.topic}")
+    elif args.fleet is not None:
+        run_fleet(args.fleet, args.host, args.topic)
+    else:
+        root = tk.Tk()
+        app = PublisherGUI(root)
+        root.mainloop()
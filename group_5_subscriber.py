@@ -5,10 +5,11 @@ IoT Data Subscriber Implementation Requirements:
 1. MQTT Broker Communication:
    - Listens to configured topic for IoT device data
    - Handles connection/disconnection gracefully
-   - Decodes JSON messages from publishers
+   - Decodes JSON messages from publishers (single packets or batches)
 
 2. Data Processing and Validation:
    - Processes incoming sensor data in real-time
+   - Parses messages on the GUI thread, off the MQTT network thread
    - Validates data against defined thresholds
    - Handles three types of data scenarios:
      a) Normal data: Within expected range
@@ -31,12 +32,33 @@ import tkinter as tk
 from tkinter import ttk
 import paho.mqtt.client as mqtt
 import json
+import math
+from collections import deque
 from datetime import datetime
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import queue
 import threading
 import time
 
+PLOT_REFRESH_MS = 100  # redraw at most 10 times per second
+PLOT_HEADROOM = 0.5  # spare axis range added on rescale so most updates can blit
+PLOT_MIN_X_SPAN = 1 / 86400  # one second, in matplotlib date units (days)
+PLOT_MIN_Y_SPAN = 1.0  # keeps flat or single-point data from collapsing the y-axis
+STATUS_REFRESH_MS = 200  # how often queued status messages are written out
+STATUS_LOG_LINES = 200  # most recent status messages kept on screen
+
+def decode_packets(payload):
+    """
+    Decodes a payload holding one packet or a batch of packets.
+    Returns: List of (ts_ms, value, packet_id) tuples
+    """
+    data = json.loads(payload)
+    # Publishers send batches as JSON arrays; single objects are still accepted
+    packets = data if isinstance(data, list) else [data]
+    return [(packet["ts_ms"], packet["value"], packet["packet_id"]) for packet in packets]
+
 class SubscriberGUI:
     def __init__(self, root):
         self.root = root
@@ -45,12 +67,17 @@ class SubscriberGUI:
         # Initialize connection state and data storage
         self.mqtt_client = None
         self.is_connected = False
-        self.data_points = []  # Stores (timestamp, value) tuples
+        self.data_points = deque(maxlen=50)  # Rolling window of (ts_ms, value) tuples
         self.last_packet_time = None
         self.missing_data_threshold = 5  # seconds before declaring data missing
+        self.plot_dirty = False  # set when new data is waiting to be drawn
+        self.status_queue = deque(maxlen=1000)  # messages waiting for the next drain
+        self.status_log = deque(maxlen=STATUS_LOG_LINES)  # messages currently displayed
+        self.message_queue = queue.SimpleQueue()  # raw payloads handed over by paho
         
         self.setup_gui()
         self.setup_plot()
+        self.drain_status()
         
     def setup_gui(self):
         """
@@ -90,11 +117,27 @@ class SubscriberGUI:
         - Line plot for sensor values over time
         - Auto-updating display
         - Limited to last 50 data points for performance
+        - Line artist created once and blitted over a cached background
         """
         self.figure, self.ax = plt.subplots(figsize=(8, 4))
+        self.line, = self.ax.plot([], [], 'b-', animated=True)
+        self.background = None  # axes pixels without the line, captured on full draws
+        self.ax.xaxis_date(tz=datetime.now().astimezone().tzinfo)  # show local time
+        self.ax.set_xlabel('Time')
+        self.ax.set_ylabel('Value')
+        self.ax.set_title('Real-time Data')
+        self.ax.tick_params(axis='x', labelrotation=45)
+        self.figure.tight_layout()
+        
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.root)
         self.canvas.get_tk_widget().grid(row=1, column=0, padx=5, pady=5)
         
+        # Full draws (startup, resize, rescale) refresh the cached background
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        
+        # Redraws are driven by a timer so message rate doesn't set render rate
+        self.root.after(PLOT_REFRESH_MS, self.refresh_plot)
+        
     def toggle_connection(self):
         """Handles connection state toggling"""
         if not self.is_connected:
@@ -142,58 +185,116 @@ class SubscriberGUI:
         client.subscribe(self.topic.get())
         
     def on_message(self, client, userdata, msg):
+        """Queues the raw payload so paho's network thread is never blocked"""
+        self.message_queue.put_nowait(msg.payload)
+        
+    def process_messages(self):
+        """Handles every payload queued since the last call (GUI thread)"""
+        while True:
+            try:
+                payload = self.message_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.handle_payload(payload)
+            
+    def handle_payload(self, payload):
         """
-        Processes incoming MQTT messages:
-        - Decodes JSON data
+        Processes an incoming MQTT payload:
+        - Decodes packet data
         - Validates value ranges
-        - Updates visualization
+        - Flags visualization for refresh
         - Handles error conditions
         """
         try:
-            data = json.loads(msg.payload)
-            value = data["value"]
-            timestamp = datetime.fromisoformat(data["timestamp"])
+            received = False
             
-            # Validate data range (threshold: ±100)
-            if abs(value) > 100:  # Erroneous data detection
-                self.update_status(f"Warning: Erroneous data detected: {value}\n")
-                return
+            # ts_ms is epoch milliseconds, converted at draw time
+            for timestamp, value, packet_id in decode_packets(payload):
+                # ts_ms must be integer epoch milliseconds (bool is an int subclass);
+                # the range keeps it convertible to datetime64 at draw time
+                if (not isinstance(timestamp, int) or isinstance(timestamp, bool)
+                        or not 0 <= timestamp < 2 ** 53):
+                    self.update_status(f"Warning: Invalid timestamp received: {timestamp!r}\n")
+                    continue
+                    
+                # Validate data range (threshold: ±100); NaN/inf would break the axis limits
+                if not math.isfinite(value) or abs(value) > 100:  # Erroneous data detection
+                    self.update_status(f"Warning: Erroneous data detected: {value}\n")
+                    continue
+                    
+                # Update data storage and timestamp
+                self.data_points.append((timestamp, value))
+                self.last_packet_time = time.time()
+                received = True
                 
-            # Update data storage and timestamp
-            self.data_points.append((timestamp, value))
-            self.last_packet_time = time.time()
-            
-            # Maintain rolling window of 50 points
-            if len(self.data_points) > 50:
-                self.data_points.pop(0)
+                self.update_status(f"Received: value={value}, packet_id={packet_id}\n")
                 
-            self.update_plot()
-            self.update_status(f"Received: {data}\n")
+            # Let the refresh timer pick up the new data
+            if received:
+                self.plot_dirty = True
             
         except json.JSONDecodeError:
             self.update_status("Error: Invalid JSON data received\n")
         except Exception as e:
             self.update_status(f"Error processing message: {str(e)}\n")
             
+    def refresh_plot(self):
+        """Processes queued messages, redraws if new data arrived, then reschedules itself"""
+        try:
+            self.process_messages()
+            if self.plot_dirty:
+                self.plot_dirty = False
+                self.update_plot()
+        except Exception as e:
+            self.update_status(f"Error updating plot: {str(e)}\n")
+        finally:
+            # Always reschedule; this timer is the only thing draining message_queue
+            self.root.after(PLOT_REFRESH_MS, self.refresh_plot)
+        
+    def on_draw(self, event):
+        """Captures the static background after a full canvas draw"""
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+        
     def update_plot(self):
         """
         Updates real-time data visualization:
-        - Clears previous plot
-        - Plots new data points
-        - Updates axes and labels
+        - Replaces the line data with the current window
+        - Blits only the line while the data stays within the axes
+        - Rescales axes with a full redraw when data leaves the view
         """
-        self.ax.clear()
-        timestamps = [d[0] for d in self.data_points]
-        values = [d[1] for d in self.data_points]
+        timestamps, values = zip(*self.data_points) if self.data_points else ((), ())
+        self.line.set_data(np.array(timestamps, dtype='datetime64[ms]'), values)
         
-        self.ax.plot(timestamps, values, 'b-')
-        self.ax.set_xlabel('Time')
-        self.ax.set_ylabel('Value')
-        self.ax.set_title('Real-time Data')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        if self.background is None or not self.data_in_view():
+            self.rescale_axes()
+            self.canvas.draw()
+            return
+            
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
+        
+    def data_in_view(self):
+        """Checks whether every plotted point lies inside the current limits"""
+        points = self.line.get_xydata()
+        x_min, x_max = self.ax.get_xlim()
+        y_min, y_max = self.ax.get_ylim()
+        return (x_min <= points[:, 0].min() and points[:, 0].max() <= x_max
+                and y_min <= points[:, 1].min() and points[:, 1].max() <= y_max)
+                
+    def rescale_axes(self):
+        """Fits the axes to the current data, leaving headroom for upcoming points"""
+        points = self.line.get_xydata()
+        x_min, x_max = points[:, 0].min(), points[:, 0].max()
+        y_min, y_max = points[:, 1].min(), points[:, 1].max()
         
-        self.canvas.draw()
+        # Limits come from the data itself; autoscale_view would stop refitting
+        # once set_xlim/set_ylim have turned autoscaling off
+        x_span = max(x_max - x_min, PLOT_MIN_X_SPAN)
+        y_pad = max(y_max - y_min, PLOT_MIN_Y_SPAN) * PLOT_HEADROOM / 2
+        self.ax.set_xlim(x_min, x_max + x_span * PLOT_HEADROOM)
+        self.ax.set_ylim(y_min - y_pad, y_max + y_pad)
         
     def monitor_missing_data(self):
         """
@@ -204,13 +305,23 @@ class SubscriberGUI:
         """
         while self.is_connected:
             if self.last_packet_time and time.time() - self.last_packet_time > self.missing_data_threshold:
-                self.root.after(0, self.update_status, "Warning: Missing data detected!\n")
+                self.update_status("Warning: Missing data detected!\n")
             time.sleep(1)
             
     def update_status(self, message):
-        """Updates status display with new messages"""
-        self.status_text.insert(tk.END, message)
-        self.status_text.see(tk.END)
+        """Queues a status message; safe to call from any thread"""
+        self.status_queue.append(message)
+        
+    def drain_status(self):
+        """Moves queued status messages into the log and redraws it in one pass"""
+        if self.status_queue:
+            self.status_log.extend(self.status_queue.popleft() for _ in range(len(self.status_queue)))
+            
+            # Replace the whole text so the widget never holds more than the log
+            self.status_text.delete("1.0", tk.END)
+            self.status_text.insert(tk.END, "".join(self.status_log))
+            self.status_text.see(tk.END)
+        self.root.after(STATUS_REFRESH_MS, self.drain_status)
         
 if __name__ == "__main__":
     root = tk.Tk()